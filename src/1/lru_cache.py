@@ -1,6 +1,6 @@
 import unittest.mock
-from collections import OrderedDict
-from typing import Any, Callable
+from functools import lru_cache as _c_lru_cache
+from typing import Callable
 
 
 def lru_cache(*args, **kwargs) -> Callable:
@@ -10,41 +10,15 @@ def lru_cache(*args, **kwargs) -> Callable:
     Может быть использован как:
     - @lru_cache
     - @lru_cache(maxsize=N)
+
+    Кэширование делегируется functools.lru_cache, реализованному на C.
     """
     # Если декоратор вызван без скобок: @lru_cache
     if len(args) == 1 and callable(args[0]) and not kwargs:
-        func = args[0]
-        return lru_cache()(func)
+        return _c_lru_cache(maxsize=None)(args[0])
 
     # Получаем maxsize из аргументов или используем значение по умолчанию
-    maxsize = kwargs.get("maxsize", None)
-
-    def decorator(func: Callable) -> Callable:
-        cache: OrderedDict = OrderedDict()
-
-        def wrapper(*args: Any, **kwargs: Any) -> Any:
-            # Создаем ключ на основе позиционных и именованных аргументов
-            key = (args, tuple(sorted(kwargs.items())))
-
-            # Если результат уже в кеше - перемещаем в конец и возвращаем
-            if key in cache:
-                result = cache.pop(key)
-                cache[key] = result
-                return result
-
-            # Вызываем функцию и сохраняем результат
-            result = func(*args, **kwargs)
-            cache[key] = result
-
-            # Если достигли максимального размера - удаляем самый старый элемент
-            if maxsize is not None and len(cache) > maxsize:
-                cache.popitem(last=False)
-
-            return result
-
-        return wrapper
-
-    return decorator
+    return _c_lru_cache(maxsize=kwargs.get("maxsize", None))
 
 
 @lru_cache
@@ -1,5 +1,7 @@
 from typing import Any, Dict
 
+_MISSING = object()
+
 
 class SingletonMeta(type):
     """Метакласс для реализации синглтона"""
@@ -7,9 +9,12 @@ class SingletonMeta(type):
     _instances: Dict[type, Any] = {}
 
     def __call__(cls, *args: Any, **kwargs: Any) -> Any:
-        if cls not in cls._instances:
-            cls._instances[cls] = super().__call__(*args, **kwargs)
-        return cls._instances[cls]
+        # Один поиск в словаре на горячем пути вместо двух
+        instance = cls._instances.get(cls, _MISSING)
+        if instance is _MISSING:
+            instance = super().__call__(*args, **kwargs)
+            cls._instances[cls] = instance
+        return instance
 
 
 class Calculator(metaclass=SingletonMeta):
@@ -1,32 +1,32 @@
 from typing import List
 
+import numpy as np
+
 
 class StatisticsCalculator:
     """Класс для статистических вычислений (синглтон через модуль)"""
 
     def __init__(self) -> None:
-        self.datasets: List[List[float]] = []
+        self.datasets: List[np.ndarray] = []
 
     def add_dataset(self, data: List[float]) -> None:
         """Добавляет набор данных для анализа"""
-        self.datasets.append(data.copy())
+        # Храним копию в виде массива NumPy для векторизованных вычислений
+        self.datasets.append(np.array(data, dtype=np.float64))
 
     def mean(self, dataset_index: int = 0) -> float:
         """Вычисляет среднее значение"""
         if not self.datasets or dataset_index >= len(self.datasets):
             return 0.0
         data = self.datasets[dataset_index]
-        return sum(data) / len(data) if data else 0.0
+        return float(data.mean()) if data.size else 0.0
 
     def variance(self, dataset_index: int = 0) -> float:
         """Вычисляет дисперсию"""
         if not self.datasets or dataset_index >= len(self.datasets):
             return 0.0
         data = self.datasets[dataset_index]
-        if not data:
-            return 0.0
-        mean_val = self.mean(dataset_index)
-        return sum((x - mean_val) ** 2 for x in data) / len(data)
+        return float(data.var()) if data.size else 0.0
 
     def get_dataset_count(self) -> int:
         return len(self.datasets)
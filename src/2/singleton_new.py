@@ -5,19 +5,16 @@ class GeometryCalculator:
     """Класс для геометрических вычислений с синглтоном через __new__"""
 
     _instance: Optional["GeometryCalculator"] = None
-    _initialized: bool = False
+    calculation_count: int
 
     def __new__(cls, *args: Any, **kwargs: Any) -> "GeometryCalculator":
         if cls._instance is None:
-            cls._instance = super().__new__(cls)
+            # Состояние инициализируется один раз при создании экземпляра
+            instance = super().__new__(cls)
+            instance.calculation_count = 0
+            cls._instance = instance
         return cls._instance
 
-    def __init__(self) -> None:
-        # Защита от повторной инициализации
-        if not GeometryCalculator._initialized:
-            self.calculation_count: int = 0
-            GeometryCalculator._initialized = True
-
     def circle_area(self, radius: float) -> float:
         """Вычисляет площадь круга"""
         self.calculation_count += 1
@@ -42,7 +39,6 @@ def test_singleton_new() -> None:
 
     # Сбрасываем состояние для чистого теста
     GeometryCalculator._instance = None
-    GeometryCalculator._initialized = False
 
     # Создаем первый экземпляр
     geom1 = GeometryCalculator()
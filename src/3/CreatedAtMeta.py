@@ -1,12 +1,23 @@
-from datetime import datetime
+from datetime import datetime, timezone
+
+
+class _CreatedAt:
+    """Дескриптор, вычисляющий created_at при первом обращении к атрибуту"""
+
+    def __get__(self, obj, owner):
+        value = owner.__dict__.get("_created_at_value")
+        if value is None:
+            value = datetime.now(timezone.utc)
+            owner._created_at_value = value
+        return value
 
 
 class CreatedAtMeta(type):
     """Метакласс, добавляющий атрибут created_at с текущей датой и временем"""
 
     def __new__(cls, name, bases, attrs):
-        # Добавляем атрибут created_at с текущим временем
-        attrs["created_at"] = datetime.now()
+        # Добавляем ленивый атрибут created_at - время фиксируется при первом чтении
+        attrs["created_at"] = _CreatedAt()
         return super().__new__(cls, name, bases, attrs)
 
 
@@ -1,3 +1,6 @@
+from bisect import bisect_left
+
+
 def search(array: list[int], number: int) -> bool:
     """
     Функция для поиска числа в отсортированном списке.
@@ -9,20 +12,9 @@ def search(array: list[int], number: int) -> bool:
     Returns:
         True если число найдено, иначе False
     """
-    left = 0
-    right = len(array) - 1
-
-    while left <= right:
-        mid = (left + right) // 2
-
-        if array[mid] == number:
-            return True
-        elif array[mid] < number:
-            left = mid + 1
-        else:
-            right = mid - 1
-
-    return False
+    # bisect_left реализован на C и находит позицию вставки за O(log n)
+    i = bisect_left(array, number)
+    return i != len(array) and array[i] == number
 
 
 if __name__ == "__main__":
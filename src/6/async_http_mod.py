@@ -1,13 +1,14 @@
 import asyncio
-import json
+import itertools
 import logging
-import time
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from time import monotonic
+from typing import Any, BinaryIO, Dict, List, Optional
 
 import aiohttp
+import orjson
 
 # Настройка логирования
 logging.basicConfig(
@@ -15,6 +16,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Как часто (в URL) выводить промежуточную сводку при обработке
+LOG_EVERY = 100
+
 
 @dataclass
 class FetchResult:
@@ -27,6 +31,35 @@ class FetchResult:
     response_time: float = 0.0
 
 
+async def _write_lines(
+    queue: asyncio.Queue, f: BinaryIO, batch_size: int = 100
+) -> None:
+    """
+    Фоновая запись строк (bytes) из очереди в файл пачками
+
+    Args:
+        queue: Очередь строк, None - сигнал завершения
+        f: Открытый на запись файл
+        batch_size: Максимальное количество строк в одной записи
+    """
+    while True:
+        batch = []
+        line = await queue.get()
+        # Забираем все, что уже накопилось в очереди, одной пачкой
+        while line is not None:
+            batch.append(line)
+            if len(batch) >= batch_size or queue.empty():
+                break
+            line = queue.get_nowait()
+
+        if batch:
+            # Системный вызов записи выполняется вне потока event loop
+            await asyncio.to_thread(f.writelines, batch)
+
+        if line is None:
+            break
+
+
 class URLFetcher:
     """Класс для асинхронной загрузки URL"""
 
@@ -45,7 +78,6 @@ class URLFetcher:
         self.max_concurrent = max_concurrent
         self.timeout = timeout
         self.max_retries = max_retries
-        self.semaphore = asyncio.Semaphore(max_concurrent)
 
     @asynccontextmanager
     async def _create_session(self) -> aiohttp.ClientSession:
@@ -65,82 +97,45 @@ class URLFetcher:
         self, session: aiohttp.ClientSession, url: str
     ) -> FetchResult:
         """Выполняет один HTTP-запрос с обработкой ошибок"""
-        start_time = time.time()
+        start_time = monotonic()
+        error_msg = "Max retries exceeded"
 
         for attempt in range(self.max_retries + 1):
-            try:
-                async with self.semaphore:
-                    async with session.get(url) as response:
-                        if response.status == 200:
-                            # Читаем и парсим JSON
-                            text = await response.text()
-                            try:
-                                json_content = json.loads(text)
-                                return FetchResult(
-                                    url=url,
-                                    success=True,
-                                    content=json_content,
-                                    response_time=time.time() - start_time,
-                                )
-                            except json.JSONDecodeError as e:
-                                error_msg = f"Invalid JSON: {str(e)}"
-                                if attempt == self.max_retries:
-                                    return FetchResult(
-                                        url=url,
-                                        success=False,
-                                        error=error_msg,
-                                        response_time=time.time() - start_time,
-                                    )
-                        else:
-                            error_msg = f"HTTP {response.status}"
-                            if attempt == self.max_retries:
-                                return FetchResult(
-                                    url=url,
-                                    success=False,
-                                    error=error_msg,
-                                    response_time=time.time() - start_time,
-                                )
+            # Пауза перед повторной попыткой
+            if attempt:
+                await asyncio.sleep(attempt)
 
+            try:
+                async with session.get(url) as response:
+                    if response.status != 200:
+                        error_msg = f"HTTP {response.status}"
+                        continue
+                    body = await response.read()
+
+                # Парсим JSON прямо из байтов, без промежуточной строки
+                json_content = orjson.loads(body)
+                return FetchResult(
+                    url=url,
+                    success=True,
+                    content=json_content,
+                    response_time=monotonic() - start_time,
+                )
+
+            except orjson.JSONDecodeError as e:
+                error_msg = f"Invalid JSON: {str(e)}"
             except asyncio.TimeoutError:
                 error_msg = "Timeout"
-                if attempt == self.max_retries:
-                    return FetchResult(
-                        url=url,
-                        success=False,
-                        error=error_msg,
-                        response_time=time.time() - start_time,
-                    )
-
             except aiohttp.ClientError as e:
                 error_msg = f"Client error: {str(e)}"
-                if attempt == self.max_retries:
-                    return FetchResult(
-                        url=url,
-                        success=False,
-                        error=error_msg,
-                        response_time=time.time() - start_time,
-                    )
-
             except Exception as e:
                 error_msg = f"Unexpected error: {str(e)}"
-                if attempt == self.max_retries:
-                    return FetchResult(
-                        url=url,
-                        success=False,
-                        error=error_msg,
-                        response_time=time.time() - start_time,
-                    )
-
-            # Пауза перед повторной попыткой
-            if attempt < self.max_retries:
-                await asyncio.sleep(1 * (attempt + 1))
 
-        # Этот код никогда не должен выполняться, но для безопасности:
+        # Все попытки исчерпаны - возвращаем последнюю ошибку
         return FetchResult(
             url=url,
             success=False,
-            error="Max retries exceeded",
-            response_time=time.time() - start_time,
+            error=error_msg,
+            response_time=monotonic() - start_time,
         )
 
     async def fetch_urls(
@@ -158,30 +153,68 @@ class URLFetcher:
         """
         stats = {"total": len(urls), "successful": 0, "failed": 0, "total_time": 0.0}
 
-        start_time = time.time()
+        start_time = monotonic()
+
+        # Уровень логирования проверяем один раз, а не на каждый URL
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        info_enabled = logger.isEnabledFor(logging.INFO)
+
+        def handle_result(result: FetchResult) -> None:
+            # Записываем успешные результаты
+            if result.success and result.content is not None:
+                # Схема строки фиксирована - собираем ее из сериализованных полей
+                # без промежуточного словаря
+                queue.put_nowait(
+                    b'{"url":'
+                    + orjson.dumps(result.url)
+                    + b',"content":'
+                    + orjson.dumps(result.content)
+                    + b"}\n"
+                )
+                stats["successful"] += 1
+                if debug_enabled:
+                    logger.debug(
+                        "✅ Success: %s (%.2fs)", result.url, result.response_time
+                    )
+            else:
+                stats["failed"] += 1
+                logger.warning("❌ Failed: %s - %s", result.url, result.error)
+
+            # Вместо строки на каждый URL - сводка раз в LOG_EVERY URL
+            processed = stats["successful"] + stats["failed"]
+            if info_enabled and processed % LOG_EVERY == 0:
+                logger.info(
+                    "Processed %d/%d URLs (successful: %d, failed: %d)",
+                    processed,
+                    stats["total"],
+                    stats["successful"],
+                    stats["failed"],
+                )
 
         async with self._create_session() as session:
-            tasks = [self._fetch_single_url(session, url) for url in urls]
-
-            # Обрабатываем результаты по мере их поступления
-            with open(output_file, "w", encoding="utf-8") as f:
-                for future in asyncio.as_completed(tasks):
-                    result = await future
-
-                    # Записываем успешные результаты
-                    if result.success and result.content is not None:
-                        output_data = {"url": result.url, "content": result.content}
-                        f.write(json.dumps(output_data, ensure_ascii=False) + "\n")
-                        f.flush()  # Обеспечиваем запись после каждого URL
-                        stats["successful"] += 1
-                        logger.info(
-                            f"✅ Success: {result.url} ({result.response_time:.2f}s)"
-                        )
-                    else:
-                        stats["failed"] += 1
-                        logger.warning(f"❌ Failed: {result.url} - {result.error}")
-
-        stats["total_time"] = time.time() - start_time
+            # Общий итератор URL для воркеров: корутины создаются по мере
+            # обработки, а не все сразу, число воркеров ограничивает параллелизм
+            pending_urls = iter(urls)
+
+            async def worker() -> None:
+                for url in pending_urls:
+                    handle_result(await self._fetch_single_url(session, url))
+
+            # Обрабатываем результаты по мере их поступления, запись в файл
+            # выполняет отдельная задача, чтобы диск не тормозил сетевой ввод-вывод
+            with open(output_file, "wb") as f:
+                queue: asyncio.Queue = asyncio.Queue()
+                writer = asyncio.create_task(_write_lines(queue, f))
+                try:
+                    async with asyncio.TaskGroup() as tg:
+                        for _ in range(min(self.max_concurrent, len(urls))):
+                            tg.create_task(worker())
+                finally:
+                    # Сигнал завершения для задачи записи
+                    queue.put_nowait(None)
+                    await writer
+
+        stats["total_time"] = monotonic() - start_time
         return stats
 
 
@@ -202,11 +235,14 @@ def read_urls_from_file(file_path: str, limit: Optional[int] = None) -> List[str
 
     urls = []
     with open(file_path, "r", encoding="utf-8") as f:
-        # Пропускаем заголовок если есть
-        lines = f.readlines()
-        start_index = 1 if lines and lines[0].strip().lower() == "url" else 0
-
-        for i, line in enumerate(lines[start_index:], start=1):
+        # Пропускаем заголовок если есть, остальные строки читаем лениво
+        first_line = f.readline()
+        if first_line.strip().lower() == "url":
+            lines = f
+        else:
+            lines = itertools.chain([first_line], f)
+
+        for line in lines:
             if limit is not None and len(urls) >= limit:
                 break
 
@@ -319,5 +355,13 @@ async def main():
 
 
 if __name__ == "__main__":
+    # uvloop (если установлен) заметно быстрее стандартного цикла событий
+    try:
+        import uvloop
+
+        loop_factory = uvloop.new_event_loop
+    except ImportError:
+        loop_factory = None
+
     # Запускаем асинхронную функцию
-    asyncio.run(main())
+    asyncio.run(main(), loop_factory=loop_factory)
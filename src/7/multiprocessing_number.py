@@ -2,28 +2,80 @@ import json
 import math
 import multiprocessing as mp
 import os
-import random
+import queue
 import time
+from collections import namedtuple
 from concurrent.futures import ThreadPoolExecutor
 from multiprocessing import Process, Queue, cpu_count
-from typing import Any, Dict, List
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import psutil
+
+# Результат обработки одного числа: кортеж компактнее и быстрее создается, чем dict
+NumResult = namedtuple(
+    "NumResult", "number is_prime double_factorial sum_cubes sum_fibonacci"
+)
+
+
+def _fibonacci_prefix_sums(limit: int) -> List[int]:
+    """Префиксные суммы чисел Фибоначчи: k-й элемент - сумма первых k чисел."""
+    prefix_sums = [0]
+    a, b = 0, 1
+    for _ in range(limit):
+        prefix_sums.append(prefix_sums[-1] + a)
+        a, b = b, a + b
+    return prefix_sums
+
+
+# Суммы уже при k=100 не помещаются в int64, поэтому храним целые Python
+_FIB_PREFIX = np.array(_fibonacci_prefix_sums(100), dtype=object)
+
+
+def _primes_up_to(limit: int) -> frozenset:
+    """Возвращает множество простых чисел не больше limit (решето Эратосфена)."""
+    sieve = [True] * (limit + 1)
+    sieve[0] = sieve[1] = False
+    for i in range(2, math.isqrt(limit) + 1):
+        if sieve[i]:
+            sieve[i * i :: i] = [False] * len(sieve[i * i :: i])
+    return frozenset(i for i, prime in enumerate(sieve) if prime)
+
+
+def _double_factorials(limit: int) -> List[int]:
+    """Таблица двойных факториалов от 0 до limit: n!! = n * (n - 2)!!."""
+    table = [1] * (limit + 1)
+    for n in range(2, limit + 1):
+        table[n] = table[n - 2] * n
+    return table
+
+
+# Входные числа лежат в диапазоне [1, 1000] - таблицы до 1000 считаем один раз
+_TABLE_LIMIT = 1000
+_PRIME_SET = _primes_up_to(_TABLE_LIMIT)
+_DOUBLE_FACT = _double_factorials(_TABLE_LIMIT)
+# Те же таблицы в виде массивов для векторной выборки по индексам
+_PRIME_MASK = np.zeros(_TABLE_LIMIT + 1, dtype=bool)
+_PRIME_MASK[sorted(_PRIME_SET)] = True
+_DOUBLE_FACT_ARRAY = np.array(_DOUBLE_FACT, dtype=object)
 
 
 def generate_data(n: int) -> List[int]:
     """Генерирует список из n случайных целых чисел от 1 до 1000."""
-    return [random.randint(1, 1000) for _ in range(n)]
+    # Все числа генерируются одним вызовом NumPy, затем один раз переводятся в list
+    rng = np.random.default_rng()
+    return rng.integers(1, 1001, size=n, dtype=np.int32).tolist()
 
 
-def process_number(number: int) -> Dict[str, Any]:
+def process_number(number: int) -> NumResult:
     """
     Более ресурсоемкие вычисления для лучшего сравнения.
     """
-    # Более сложная проверка на простое число
+    # Проверка на простое число: для чисел из диапазона данных - по таблице
     is_prime = True
-    if number < 2:
-        is_prime = False
-    elif number == 2:
-        is_prime = True
+    if number <= _TABLE_LIMIT:
+        is_prime = number in _PRIME_SET
     elif number % 2 == 0:
         is_prime = False
     else:
@@ -33,12 +85,15 @@ def process_number(number: int) -> Dict[str, Any]:
                 is_prime = False
                 break
 
-    # Вычисление двойного факториала для увеличения нагрузки
-    double_factorial = 1
-    current = number
-    while current > 0:
-        double_factorial *= current
-        current -= 2
+    # Двойной факториал: для чисел из диапазона данных - по таблице
+    if number <= _TABLE_LIMIT:
+        double_factorial = _DOUBLE_FACT[max(number, 0)]
+    else:
+        double_factorial = 1
+        current = number
+        while current > 0:
+            double_factorial *= current
+            current -= 2
 
     # Сумма различных математических последовательностей
     sum_cubes = sum(i**3 for i in range(1, min(number, 100) + 1))
@@ -48,108 +103,211 @@ def process_number(number: int) -> Dict[str, Any]:
         sum_fibonacci += a
         a, b = b, a + b
 
-    return {
-        "number": number,
-        "is_prime": is_prime,
-        "double_factorial": double_factorial,
-        "sum_cubes": sum_cubes,
-        "sum_fibonacci": sum_fibonacci,
-    }
+    return NumResult(number, is_prime, double_factorial, sum_cubes, sum_fibonacci)
 
 
-def sequential_processing(data: List[int]) -> List[Dict[str, Any]]:
-    """Однопоточная обработка данных."""
-    return [process_number(num) for num in data]
+def process_numbers_vec(data: np.ndarray) -> List[NumResult]:
+    """
+    Векторизованный аналог process_number для всего массива сразу.
+
+    Простота и двойной факториал берутся из готовых таблиц до _TABLE_LIMIT,
+    сумма кубов - по формуле (k(k+1)/2)^2, сумма чисел Фибоначчи - по таблице
+    префиксных сумм. Редкие числа больше _TABLE_LIMIT считаются скалярным кодом
+    один раз на уникальное значение - таблицы под них не расширяются.
+    """
+    arr = np.asarray(data, dtype=np.int64)
+    if arr.size == 0:
+        return []
+
+    indices = np.maximum(arr, 0)
+
+    table_indices = np.minimum(indices, _TABLE_LIMIT)
+    is_prime = _PRIME_MASK[table_indices].tolist()
+    double_factorial = _DOUBLE_FACT_ARRAY[table_indices].tolist()
+
+    # Числа вне таблиц: простота и n!! считаются по одному разу на значение
+    (large_positions,) = np.nonzero(arr > _TABLE_LIMIT)
+    if large_positions.size:
+        large_numbers = arr[large_positions].tolist()
+        large_results = {
+            number: process_number(number) for number in set(large_numbers)
+        }
+        for position, number in zip(large_positions.tolist(), large_numbers):
+            result = large_results[number]
+            is_prime[position] = result.is_prime
+            double_factorial[position] = result.double_factorial
+
+    k = np.minimum(indices, 100)
+    sum_cubes = (k * (k + 1) // 2) ** 2
+    sum_fibonacci = _FIB_PREFIX[k]
+
+    return list(
+        map(
+            NumResult,
+            arr.tolist(),
+            is_prime,
+            double_factorial,
+            sum_cubes.tolist(),
+            sum_fibonacci.tolist(),
+        )
+    )
 
 
-def parallel_threads(data: List[int], max_workers: int = None) -> List[Dict[str, Any]]:
+def sequential_processing(data: List[int]) -> List[NumResult]:
+    """Однопоточная обработка данных (векторизованная через NumPy)."""
+    return process_numbers_vec(data)
+
+
+def parallel_threads(data: List[int], max_workers: int = None) -> List[NumResult]:
     """Параллельная обработка с использованием пула потоков."""
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
         results = list(executor.map(process_number, data))
     return results
 
 
-def parallel_processes_pool(data: List[int]) -> List[Dict[str, Any]]:
+def parallel_processes_pool(data: List[int]) -> List[NumResult]:
     """Параллельная обработка с использованием multiprocessing.Pool."""
+    # Крупные пачки: каждый воркер получает тысячи чисел за один обмен данными
+    chunksize = max(1, len(data) // (cpu_count() * 4))
     with mp.Pool(processes=cpu_count()) as pool:
-        results = pool.map(process_number, data)
+        results = pool.map(process_number, data, chunksize=chunksize)
     return results
 
 
-def worker_process_optimized(input_queue: Queue, output_queue: Queue, process_id: int):
+def worker_process_optimized(
+    input_queue: Queue,
+    output_queue: Queue,
+    process_id: int,
+    shm_name: str,
+    size: int,
+):
     """Оптимизированная функция-воркер с пакетной обработкой."""
-    batch_size = 100  # Обрабатываем пачками для уменьшения накладных расходов
-    batch = []
-
-    while True:
-        try:
-            data = input_queue.get(timeout=1)  # Таймаут для избежания блокировки
-            if data is None:  # Сигнал завершения
-                if batch:
-                    # Обрабатываем оставшиеся данные в батче
-                    for number, index in batch:
-                        result = process_number(number)
-                        output_queue.put((index, result))
+    # Закрепляем воркер за отдельным ядром, чтобы не терять кэши при миграции.
+    # sched_setaffinity есть только в Linux - на других ОС работаем без привязки
+    try:
+        available_cpus = sorted(os.sched_getaffinity(0))
+        os.sched_setaffinity(0, {available_cpus[process_id % len(available_cpus)]})
+    except (AttributeError, OSError):
+        pass
+
+    # Входные данные читаем из общей памяти, по очереди приходят только границы
+    shm = SharedMemory(name=shm_name, track=False)
+    data = np.ndarray((size,), dtype=np.int64, buffer=shm.buf)
+    try:
+        while True:
+            # Блокирующее ожидание: воркер завершается только по сигналу None
+            task = input_queue.get()
+            if task is None:  # Сигнал завершения
                 break
 
-            batch.append(data)
+            start, stop = task
+            chunk = data[start:stop].tolist()
+            output_queue.put((start, [process_number(number) for number in chunk]))
+    finally:
+        # Представление массива нужно освободить до закрытия общей памяти
+        del data
+        shm.close()
 
-            if len(batch) >= batch_size:
-                # Обрабатываем весь батч
-                for number, index in batch:
-                    result = process_number(number)
-                    output_queue.put((index, result))
-                batch.clear()
 
-        except:
-            continue
+def _physical_cpu_count() -> int:
+    """Количество физических ядер (или логических, если ОС их не сообщает)."""
+    return psutil.cpu_count(logical=False) or psutil.cpu_count() or 1
 
 
-def parallel_individual_processes_optimized(data: List[int]) -> List[Dict[str, Any]]:
-    """Оптимизированная версия с отдельными процессами."""
-    num_processes = min(
-        cpu_count(), len(data) // 1000
-    )  # Адаптивное количество процессов
-    if num_processes < 1:
-        num_processes = 1
+def parallel_individual_processes_optimized(
+    data: List[int], num_processes: Optional[int] = None
+) -> List[NumResult]:
+    """
+    Оптимизированная версия с отдельными процессами.
 
-    input_queue = Queue()
-    output_queue = Queue()
+    Args:
+        data: Список чисел для обработки
+        num_processes: Количество процессов; по умолчанию подбирается по размеру данных
+    """
+    if num_processes is None:
+        # Рост производительности упирается в число физических ядер, а не
+        # логических; на процесс приходится не меньше ~500 чисел, но при
+        # достаточном объеме данных запускаем хотя бы два процесса
+        cores = _physical_cpu_count()
+        num_processes = min(cores, max(1, len(data) // 500))
+        if len(data) >= 2 * cores:
+            num_processes = max(num_processes, 2)
+    num_processes = max(1, num_processes)
+
+    # Копируем данные в общую память один раз вместо сериализации через очередь
+    shm = SharedMemory(create=True, size=max(1, len(data)) * 8)
+    shared_data = np.ndarray((len(data),), dtype=np.int64, buffer=shm.buf)
+    shared_data[:] = data
 
-    # Создание и запуск процессов
     processes = []
-    for i in range(num_processes):
-        p = Process(
-            target=worker_process_optimized, args=(input_queue, output_queue, i)
-        )
-        p.start()
-        processes.append(p)
-
-    # Отправка данных в очередь пачками
-    for i, number in enumerate(data):
-        input_queue.put((number, i))
-
-    # Отправка сигналов завершения
-    for _ in range(num_processes):
-        input_queue.put(None)
-
-    # Сбор результатов
-    results = [None] * len(data)
-    received_count = 0
-    while received_count < len(data):
-        try:
-            index, result = output_queue.get(timeout=30)  # Таймаут на случай проблем
-            results[index] = result
+    try:
+        input_queue = Queue()
+        output_queue = Queue()
+
+        # Создание и запуск процессов
+        for i in range(num_processes):
+            p = Process(
+                target=worker_process_optimized,
+                args=(input_queue, output_queue, i, shm.name, len(data)),
+            )
+            p.start()
+            processes.append(p)
+
+        # Отправка границ пачек: одна операция с очередью на пачку
+        chunk_size = max(1, math.ceil(len(data) / (num_processes * 4)))
+        chunk_count = 0
+        for start in range(0, len(data), chunk_size):
+            input_queue.put((start, min(start + chunk_size, len(data))))
+            chunk_count += 1
+
+        # Отправка сигналов завершения
+        for _ in range(num_processes):
+            input_queue.put(None)
+
+        # Сбор результатов: пока очередь молчит, проверяем, живы ли воркеры,
+        # чтобы не ждать вечно результатов от упавшего процесса
+        results = [None] * len(data)
+        received_count = 0
+        while received_count < chunk_count:
+            try:
+                start, chunk_results = output_queue.get(timeout=1)
+            except queue.Empty:
+                failed = [p for p in processes if p.exitcode not in (None, 0)]
+                if failed:
+                    raise RuntimeError(
+                        f"Воркер {failed[0].name} завершился с кодом "
+                        f"{failed[0].exitcode}"
+                    ) from None
+                if all(p.exitcode is not None for p in processes):
+                    # Последние пачки могли прийти уже после таймаута: завершенные
+                    # воркеры все записали в канал, поэтому дочитываем очередь
+                    while received_count < chunk_count:
+                        try:
+                            start, chunk_results = output_queue.get_nowait()
+                        except queue.Empty:
+                            raise RuntimeError(
+                                "Воркеры завершились, не вернув все результаты"
+                            ) from None
+                        results[start : start + len(chunk_results)] = chunk_results
+                        received_count += 1
+                continue
+            results[start : start + len(chunk_results)] = chunk_results
             received_count += 1
-        except:
-            print("Таймаут при получении результатов")
-            break
-
-    # Ожидание завершения процессов
-    for p in processes:
-        p.join(timeout=5)
-        if p.is_alive():
+    except BaseException:
+        # После ошибки результаты оставшихся воркеров не нужны
+        for p in processes:
             p.terminate()
+        raise
+    finally:
+        # Ожидание завершения процессов; зависшие останавливаем принудительно
+        for p in processes:
+            p.join(timeout=5)
+            if p.is_alive():
+                p.terminate()
+                p.join()
+        del shared_data
+        shm.close()
+        shm.unlink()
 
     return results
 
@@ -255,13 +413,16 @@ def get_script_directory() -> str:
     return os.path.dirname(os.path.abspath(__file__))
 
 
-def save_results(results: List[Dict[str, Any]], filename: str) -> None:
+def save_results(results: List[NumResult], filename: str) -> None:
     """Сохраняет результаты в JSON файл в той же папке что и скрипт."""
     script_dir = get_script_directory()
     full_path = os.path.join(script_dir, filename)
 
     with open(full_path, "w", encoding="utf-8") as f:
-        json.dump(results, f, indent=2, ensure_ascii=False)
+        # Преобразуем кортежи в словари только здесь, при записи в JSON
+        json.dump(
+            [result._asdict() for result in results], f, indent=2, ensure_ascii=False
+        )
     print(f"✓ Результаты сохранены в: {full_path}")
 
 
@@ -1,13 +1,52 @@
-from typing import Any, Callable, Dict
+from typing import Any, Callable, Dict, Union
 
 from common import (
+    close_session,
     create_asgi_response,
     create_error_response,
     extract_currency_from_path,
-    fetch_exchange_rates_async,
+    fetch_exchange_rates_raw_async,
+    get_session,
 )
 
 
+async def lifespan(receive: Callable, send: Callable) -> None:
+    """
+    Обработка событий жизненного цикла ASGI.
+
+    При запуске создает общую сессию aiohttp, при остановке закрывает ее.
+
+    Args:
+        receive: Функция для получения событий
+        send: Функция для отправки подтверждений
+    """
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await get_session()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await close_session()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def send_json(
+    send: Callable, status: int, body: Union[Dict[str, Any], bytes]
+) -> None:
+    """
+    Отправляет JSON-ответ: начало ответа и тело подряд.
+
+    Args:
+        send: Функция для отправки ответа
+        status: HTTP статус код
+        body: Тело ответа
+    """
+    response_start, response_body = create_asgi_response(status, body)
+    await send(response_start)
+    await send(response_body)
+
+
 async def asgi_app(scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
     """
     ASGI приложение для проксирования курса валют.
@@ -17,6 +56,10 @@ async def asgi_app(scope: Dict[str, Any], receive: Callable, send: Callable) ->
         receive: Функция для получения тела запроса
         send: Функция для отправки ответа
     """
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+        return
+
     if scope["type"] != "http":
         # Игнорируем не HTTP запросы
         return
@@ -26,35 +69,27 @@ async def asgi_app(scope: Dict[str, Any], receive: Callable, send: Callable) ->
         error_response = create_error_response(
             "Method not allowed", "Only GET method is supported"
         )
-        response_start, response_body = create_asgi_response(405, error_response)
-        await send(response_start)
-        await send(response_body)
+        await send_json(send, 405, error_response)
         return
 
     # Извлекаем и валидируем код валюты
     currency, error = extract_currency_from_path(scope["path"])
 
     if error:
-        response_start, response_body = create_asgi_response(400, error)
-        await send(response_start)
-        await send(response_body)
+        await send_json(send, 400, error)
         return
 
     try:
-        # Получаем данные от API
-        rates_data = await fetch_exchange_rates_async(currency)
+        # Получаем данные от API и проксируем тело ответа без разбора JSON
+        rates_data = await fetch_exchange_rates_raw_async(currency)
 
         # Отправляем успешный ответ
-        response_start, response_body = create_asgi_response(200, rates_data)
-        await send(response_start)
-        await send(response_body)
+        await send_json(send, 200, rates_data)
 
     except Exception as e:
         # Обрабатываем ошибки
         error_body = create_error_response("Failed to fetch exchange rates", str(e))
-        response_start, response_body = create_asgi_response(500, error_body)
-        await send(response_start)
-        await send(response_body)
+        await send_json(send, 500, error_body)
 
 
 # Экспорт для ASGI серверов
@@ -1,32 +1,128 @@
-import json
-from http.client import HTTPConnection
-from typing import Any, Dict, Optional, Tuple
+import asyncio
+from time import monotonic
+from typing import Any, Dict, Optional, Tuple, Union
 
 import aiohttp
+import orjson
+import urllib3
 
+# Заголовки по умолчанию одинаковы для всех ответов - собираем их один раз
+_DEFAULT_HEADERS = (
+    (b"content-type", b"application/json"),
+    (b"access-control-allow-origin", b"*"),
+)
 
-async def fetch_exchange_rates_async(currency: str) -> Dict[str, Any]:
+
+# Общая сессия aiohttp: соединения с API переиспользуются между запросами
+_session: Optional[aiohttp.ClientSession] = None
+_session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+async def get_session() -> aiohttp.ClientSession:
     """
-    Асинхронно получает курс валют от стороннего API.
+    Возвращает общую сессию aiohttp, создавая ее при первом обращении.
+
+    Сессия привязана к циклу событий, поэтому при смене цикла создается заново.
+
+    Returns:
+        Сессия aiohttp с пулом соединений
+    """
+    global _session, _session_loop
+
+    loop = asyncio.get_running_loop()
+    if _session is not None and not _session.closed and _session_loop is not loop:
+        # Сессия от предыдущего цикла событий больше не нужна - закрываем ее,
+        # иначе она останется незакрытой
+        try:
+            await _session.close()
+        except RuntimeError:  # цикл событий сессии уже закрыт
+            pass
+    if _session is None or _session.closed or _session_loop is not loop:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300)
+        )
+        _session_loop = loop
+    return _session
+
+
+async def close_session() -> None:
+    """Закрывает общую сессию aiohttp, если она была создана."""
+    global _session, _session_loop
+
+    if _session is not None:
+        await _session.close()
+    _session = None
+    _session_loop = None
+
+
+# Кэш курсов валют: код валюты -> (время получения, тело ответа API)
+RATES_CACHE_TTL = 60.0
+_rates_cache: Dict[str, Tuple[float, bytes]] = {}
+_rates_locks: Dict[str, asyncio.Lock] = {}
+
+
+async def fetch_exchange_rates_raw_async(currency: str) -> bytes:
+    """
+    Асинхронно получает курс валют от стороннего API без разбора JSON.
+
+    Ответы кэшируются на RATES_CACHE_TTL секунд для каждой валюты.
 
     Args:
         currency: Код валюты (например, 'USD')
 
     Returns:
-        Словарь с данными о курсах валют
+        Тело ответа API (JSON в байтах)
 
     Raises:
         Exception: Если произошла ошибка при запросе
     """
-    url = f"https://api.exchangerate-api.com/v4/latest/{currency.upper()}"
+    currency = currency.upper()
+
+    cached = _rates_cache.get(currency)
+    if cached is not None and monotonic() - cached[0] < RATES_CACHE_TTL:
+        return cached[1]
+
+    # Одна загрузка на валюту: остальные запросы ждут ее результата
+    lock = _rates_locks.get(currency)
+    if lock is None:
+        lock = _rates_locks[currency] = asyncio.Lock()
+    async with lock:
+        cached = _rates_cache.get(currency)
+        if cached is not None and monotonic() - cached[0] < RATES_CACHE_TTL:
+            return cached[1]
+
+        url = f"https://api.exchangerate-api.com/v4/latest/{currency}"
 
-    async with aiohttp.ClientSession() as session:
+        session = await get_session()
         async with session.get(url) as response:
             if response.status == 200:
-                return await response.json()
+                body = await response.read()
             else:
                 raise Exception(f"API returned status {response.status}")
 
+        _rates_cache[currency] = (monotonic(), body)
+        return body
+
+
+async def fetch_exchange_rates_async(currency: str) -> Dict[str, Any]:
+    """
+    Асинхронно получает курс валют от стороннего API.
+
+    Args:
+        currency: Код валюты (например, 'USD')
+
+    Returns:
+        Словарь с данными о курсах валют
+
+    Raises:
+        Exception: Если произошла ошибка при запросе
+    """
+    return orjson.loads(await fetch_exchange_rates_raw_async(currency))
+
+
+# Пул соединений для синхронных запросов (keep-alive между вызовами)
+_http = urllib3.PoolManager(maxsize=16)
+
 
 def fetch_exchange_rates_sync(currency: str) -> Dict[str, Any]:
     """
@@ -41,47 +137,47 @@ def fetch_exchange_rates_sync(currency: str) -> Dict[str, Any]:
     Raises:
         Exception: Если произошла ошибка при запросе
     """
-    conn = HTTPConnection("api.exchangerate-api.com")
-    conn.request("GET", f"/v4/latest/{currency.upper()}")
-    response = conn.getresponse()
+    response = _http.request(
+        "GET", f"https://api.exchangerate-api.com/v4/latest/{currency.upper()}"
+    )
 
     if response.status == 200:
-        data = response.read().decode("utf-8")
-        return json.loads(data)
+        return orjson.loads(response.data)
     else:
         raise Exception(f"API returned status {response.status}")
 
 
 def create_asgi_response(
-    status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None
+    status: int,
+    body: Union[Dict[str, Any], bytes],
+    headers: Optional[Dict[str, str]] = None,
 ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
     """
     Создает структуру ответа ASGI.
 
     Args:
         status: HTTP статус код
-        body: Тело ответа
+        body: Тело ответа (словарь или уже готовый JSON в байтах)
         headers: Дополнительные заголовки
 
     Returns:
         Кортеж (start_response, body_response)
     """
-    default_headers = [
-        (b"content-type", b"application/json"),
-        (b"access-control-allow-origin", b"*"),
-    ]
-
+    response_headers = _DEFAULT_HEADERS
     if headers:
-        for key, value in headers.items():
-            default_headers.append((key.encode(), value.encode()))
+        response_headers = [
+            *_DEFAULT_HEADERS,
+            *((key.encode(), value.encode()) for key, value in headers.items()),
+        ]
 
-    body_bytes = json.dumps(body).encode("utf-8")
+    # Готовые байты (например, ответ API) отдаем без повторной сериализации
+    body_bytes = body if isinstance(body, bytes) else orjson.dumps(body)
 
     return (
         {
             "type": "http.response.start",
             "status": status,
-            "headers": default_headers,
+            "headers": response_headers,
         },
         {
             "type": "http.response.body",
@@ -90,6 +186,17 @@ def create_asgi_response(
     )
 
 
+# Ответы об ошибках валидации не меняются - создаем их один раз
+_CURRENCY_REQUIRED_ERROR = {
+    "error": "Currency code is required",
+    "example": "Use /USD or /EUR",
+}
+_INVALID_CURRENCY_ERROR = {
+    "error": "Invalid currency code",
+    "details": "Currency code must be 3 letters (e.g., USD, EUR)",
+}
+
+
 def extract_currency_from_path(
     path: str,
 ) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
@@ -102,23 +209,21 @@ def extract_currency_from_path(
     Returns:
         Кортеж (currency, error_response) - если ошибка, то currency=None
     """
+    # Быстрый путь для типичного запроса вида "/usd"
+    if len(path) == 4 and path[0] == "/":
+        code = path[1:]
+        if code.isascii() and code.isalpha():
+            return code.upper(), None
+
     # Убираем начальный и конечный слэши
     path = path.strip("/")
 
     if not path:
-        error_response = {
-            "error": "Currency code is required",
-            "example": "Use /USD or /EUR",
-        }
-        return None, error_response
+        return None, _CURRENCY_REQUIRED_ERROR
 
     # Простая валидация - только буквы, длина 3
     if not path.isalpha() or len(path) != 3:
-        error_response = {
-            "error": "Invalid currency code",
-            "details": "Currency code must be 3 letters (e.g., USD, EUR)",
-        }
-        return None, error_response
+        return None, _INVALID_CURRENCY_ERROR
 
     return path.upper(), None
 
@@ -3,19 +3,115 @@
 """
 
 # import requests
-import asyncio
 import json
+from unittest.mock import AsyncMock
 
+import asgi
+import common
 import pytest
+from asgi import asgi_app
+from common import (
+    close_session,
+    create_asgi_response,
+    create_error_response,
+    extract_currency_from_path,
+    fetch_exchange_rates_async,
+    fetch_exchange_rates_sync,
+    get_session,
+)
 
 # import aiohttp
 # from typing import Dict, Any, List, Callable
 
+# Фиксированный ответ внешнего API для тестов ASGI приложения
+MOCK_RATES = {"base": "USD", "rates": {"USD": 1.0, "EUR": 0.9}}
+
+
+@pytest.fixture
+def mock_rates(monkeypatch):
+    """Подменяет запрос к внешнему API фиксированным ответом"""
+    mock = AsyncMock(return_value=json.dumps(MOCK_RATES).encode("utf-8"))
+    # asgi импортирует функцию по имени, поэтому подменяем ее в модуле asgi
+    monkeypatch.setattr(asgi, "fetch_exchange_rates_raw_async", mock)
+    return mock
+
+
+class _FakeResponse:
+    """Ответ внешнего API с заданным статусом"""
+
+    def __init__(self, status):
+        self.status = status
+
+    async def read(self):
+        return json.dumps(MOCK_RATES).encode("utf-8")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class _FakeSession:
+    """Сессия aiohttp, считающая запросы к внешнему API"""
+
+    def __init__(self, status=200):
+        self.status = status
+        self.requests = []
+
+    def get(self, url):
+        self.requests.append(url)
+        return _FakeResponse(self.status)
+
+
+@pytest.fixture
+def rates_cache(monkeypatch):
+    """Пустой кэш курсов, подмененные сессия и часы"""
+    session = _FakeSession()
+    clock = [1000.0]
+    monkeypatch.setattr(common, "_rates_cache", {})
+    monkeypatch.setattr(common, "_rates_locks", {})
+    monkeypatch.setattr(common, "get_session", AsyncMock(return_value=session))
+    monkeypatch.setattr(common, "monotonic", lambda: clock[0])
+    return session, clock
+
+
+@pytest.fixture
+def call_app():
+    """Вызывает ASGI приложение и возвращает сообщения start и body"""
+
+    async def _call(method, path):
+        received_messages = []
+
+        async def receive():
+            return {"type": "http.request"}
+
+        async def send(message):
+            received_messages.append(message)
+
+        scope = {
+            "type": "http",
+            "method": method,
+            "path": path,
+        }
+        await asgi_app(scope, receive, send)
+
+        start_message = next(
+            (m for m in received_messages if m["type"] == "http.response.start"),
+            None,
+        )
+        body_message = next(
+            (m for m in received_messages if m["type"] == "http.response.body"), None
+        )
+        assert start_message is not None, "Should have start response message"
+        assert body_message is not None, "Should have body response message"
+        return start_message, body_message
+
+    return _call
+
 
 def test_currency_extraction():
     """Тестирование функции извлечения валюты из пути"""
-    from common import extract_currency_from_path
-
     # Тестовые случаи
     test_cases = [
         ("/USD", ("USD", None)),
@@ -71,8 +167,6 @@ def test_currency_extraction():
 
 def test_error_response_creation():
     """Тестирование создания ошибок"""
-    from common import create_error_response
-
     # Тест без деталей
     error1 = create_error_response("Test error")
     assert error1 == {"error": "Test error"}
@@ -86,8 +180,6 @@ def test_error_response_creation():
 
 def test_asgi_response_creation():
     """Тестирование создания ASGI ответов"""
-    from common import create_asgi_response
-
     test_data = {"test": "data", "number": 123}
     start_response, body_response = create_asgi_response(200, test_data)
 
@@ -104,88 +196,35 @@ def test_asgi_response_creation():
 
 
 @pytest.mark.asyncio
-async def test_asgi_app_structure():
+async def test_asgi_app_structure(mock_rates, call_app):
     """Тестирование структуры ASGI приложения"""
-    from asgi import asgi_app
-
-    scope = {
-        "type": "http",
-        "method": "GET",
-        "path": "/USD",
-    }
+    start_message, body_message = await call_app("GET", "/USD")
 
-    received_messages = []
-
-    async def receive():
-        return {"type": "http.request"}
-
-    async def send(message):
-        received_messages.append(message)
-
-    await asgi_app(scope, receive, send)
-
-    assert len(received_messages) >= 2, (
-        "Should receive at least start and body messages"
-    )
-
-    start_message = next(
-        (m for m in received_messages if m["type"] == "http.response.start"), None
-    )
-    body_message = next(
-        (m for m in received_messages if m["type"] == "http.response.body"), None
-    )
-
-    assert start_message is not None, "Should have start response message"
-    assert body_message is not None, "Should have body response message"
     assert start_message["status"] == 200
     assert (b"content-type", b"application/json") in start_message["headers"]
+    assert json.loads(body_message["body"].decode("utf-8")) == MOCK_RATES
 
     print("✓ test_asgi_app_structure passed")
 
 
 @pytest.mark.asyncio
-async def test_asgi_app_method_validation():
+async def test_asgi_app_method_validation(mock_rates, call_app):
     """Тестирование валидации методов в ASGI"""
-    from asgi import asgi_app
-
-    scope = {
-        "type": "http",
-        "method": "POST",  # Неподдерживаемый метод
-        "path": "/USD",
-    }
-
-    received_messages = []
+    # Неподдерживаемый метод
+    start_message, body_message = await call_app("POST", "/USD")
 
-    async def receive():
-        return {"type": "http.request"}
-
-    async def send(message):
-        received_messages.append(message)
-
-    await asgi_app(scope, receive, send)
-
-    start_message = next(
-        (m for m in received_messages if m["type"] == "http.response.start"), None
-    )
-    assert start_message is not None, "Should have start response message"
     assert start_message["status"] == 405
 
-    body_message = next(
-        (m for m in received_messages if m["type"] == "http.response.body"), None
-    )
-    assert body_message is not None, "Should have body response message"
-
     error_data = json.loads(body_message["body"].decode("utf-8"))
     assert "error" in error_data
     assert "Method not allowed" in error_data["error"]
+    mock_rates.assert_not_called()
 
     print("✓ test_asgi_app_method_validation passed")
 
 
 def test_exchange_rates_api_sync():
     """Тестирование синхронного API получения курсов валют"""
-    from common import fetch_exchange_rates_sync
-
     try:
         result = fetch_exchange_rates_sync("USD")
 
@@ -206,8 +245,6 @@ def test_exchange_rates_api_sync():
 @pytest.mark.asyncio
 async def test_exchange_rates_api_async():
     """Тестирование асинхронного API получения курсов валют"""
-    from common import fetch_exchange_rates_async
-
     try:
         result = await fetch_exchange_rates_async("EUR")
 
@@ -223,130 +260,124 @@ async def test_exchange_rates_api_async():
         print("✓ test_exchange_rates_api_async passed")
     except Exception as e:
         print(f"⚠ test_exchange_rates_api_async skipped: {e}")
+    finally:
+        await close_session()
 
 
 @pytest.mark.asyncio
-async def test_asgi_app_invalid_paths():
-    """Тестирование ASGI с некорректными путями"""
-    from asgi import asgi_app
+async def test_rates_cache_hit_within_ttl(rates_cache):
+    """Повторный запрос в пределах TTL не обращается к внешнему API"""
+    session, clock = rates_cache
 
-    test_cases = [
-        ("/", 400),
-        ("/123", 400),
-        ("/USDD", 400),
-    ]
+    first = await common.fetch_exchange_rates_raw_async("usd")
+    clock[0] += common.RATES_CACHE_TTL - 1
+    second = await common.fetch_exchange_rates_raw_async("USD")
 
-    for path, expected_status in test_cases:
-        scope = {
-            "type": "http",
-            "method": "GET",
-            "path": path,
-        }
+    assert first == second
+    assert len(session.requests) == 1
 
-        received_messages = []
 
-        async def receive():
-            return {"type": "http.request"}
+@pytest.mark.asyncio
+async def test_rates_cache_expires_after_ttl(rates_cache):
+    """После истечения TTL курсы запрашиваются заново"""
+    session, clock = rates_cache
 
-        async def send(message):
-            received_messages.append(message)
+    await common.fetch_exchange_rates_raw_async("USD")
+    clock[0] += common.RATES_CACHE_TTL + 1
+    await common.fetch_exchange_rates_raw_async("USD")
 
-        await asgi_app(scope, receive, send)
+    assert len(session.requests) == 2
 
-        start_message = next(
-            (m for m in received_messages if m["type"] == "http.response.start"), None
-        )
-        assert start_message is not None, (
-            f"Should have start response for path '{path}'"
-        )
-        assert start_message["status"] == expected_status, (
-            f"Failed for path '{path}': expected {expected_status}, got {start_message['status']}"
-        )
 
-    print("✓ test_asgi_app_invalid_paths passed")
+@pytest.mark.asyncio
+async def test_rates_cache_skips_errors(rates_cache):
+    """Ответ с ошибкой не кэшируется"""
+    session, _ = rates_cache
+    session.status = 503
 
+    with pytest.raises(Exception, match="503"):
+        await common.fetch_exchange_rates_raw_async("USD")
 
-@pytest.mark.asyncio
-async def test_asgi_app_successful_response():
-    """Тестирование успешного ответа ASGI приложения"""
-    from asgi import asgi_app
+    session.status = 200
+    await common.fetch_exchange_rates_raw_async("USD")
 
-    scope = {
-        "type": "http",
-        "method": "GET",
-        "path": "/USD",
-    }
+    assert len(session.requests) == 2
 
-    received_messages = []
+
+@pytest.mark.asyncio
+async def test_asgi_app_lifespan():
+    """Тестирование событий запуска и остановки ASGI приложения"""
+    events = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+    sent_messages = []
+    sessions = []
 
     async def receive():
-        return {"type": "http.request"}
+        return events.pop(0)
 
     async def send(message):
-        received_messages.append(message)
+        sent_messages.append(message["type"])
+        if message["type"] == "lifespan.startup.complete":
+            # Сессия уже создана при запуске - get_session вернет ее же
+            session = await get_session()
+            assert not session.closed
+            sessions.append(session)
+
+    await asgi_app({"type": "lifespan"}, receive, send)
+
+    assert sent_messages == [
+        "lifespan.startup.complete",
+        "lifespan.shutdown.complete",
+    ]
+    assert len(sessions) == 1
+    assert sessions[0].closed, "Session should be closed on shutdown"
 
-    await asgi_app(scope, receive, send)
+    print("✓ test_asgi_app_lifespan passed")
 
-    # Находим сообщения
-    start_message = next(
-        (m for m in received_messages if m["type"] == "http.response.start"), None
-    )
-    body_message = next(
-        (m for m in received_messages if m["type"] == "http.response.body"), None
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path", ["/", "/123", "/USDD"])
+async def test_asgi_app_invalid_paths(mock_rates, call_app, path):
+    """Тестирование ASGI с некорректными путями"""
+    start_message, _ = await call_app("GET", path)
+
+    assert start_message["status"] == 400, (
+        f"Failed for path '{path}': expected 400, got {start_message['status']}"
     )
+    mock_rates.assert_not_called()
 
-    assert start_message is not None
-    assert start_message["status"] == 200
 
-    assert body_message is not None
+@pytest.mark.asyncio
+async def test_asgi_app_successful_response(mock_rates, call_app):
+    """Тестирование успешного ответа ASGI приложения"""
+    start_message, body_message = await call_app("GET", "/usd")
+
+    assert start_message["status"] == 200
     data = json.loads(body_message["body"].decode("utf-8"))
 
-    # Проверяем базовую структуру ответа
-    assert "base" in data
-    assert data["base"] == "USD"
-    assert "rates" in data
-    assert isinstance(data["rates"], dict)
+    # Ответ внешнего API передается клиенту без изменений
+    assert data == MOCK_RATES
+    mock_rates.assert_awaited_once_with("USD")
 
     print("✓ test_asgi_app_successful_response passed")
 
 
-def run_all_tests():
-    """Запуск всех тестов (для запуска без pytest)"""
-    print("Running currency exchange proxy tests...")
-    print("=" * 50)
-
-    # Синхронные тесты
-    test_currency_extraction()
-    test_error_response_creation()
-    test_asgi_response_creation()
-    test_exchange_rates_api_sync()
-
-    # Асинхронные тесты
-    async_tests = [
-        test_asgi_app_structure(),
-        test_asgi_app_method_validation(),
-        test_asgi_app_invalid_paths(),
-        test_asgi_app_successful_response(),
-        test_exchange_rates_api_async(),
-    ]
+@pytest.mark.asyncio
+async def test_asgi_app_upstream_error(mock_rates, call_app):
+    """Тестирование ответа ASGI приложения при ошибке внешнего API"""
+    mock_rates.side_effect = RuntimeError("upstream is down")
 
-    # Запуск асинхронных тестов
-    async def run_async_tests():
-        for test in async_tests:
-            await test
+    start_message, body_message = await call_app("GET", "/USD")
+
+    assert start_message["status"] == 500
+    error_data = json.loads(body_message["body"].decode("utf-8"))
+    assert "error" in error_data
 
-    asyncio.run(run_async_tests())
 
-    print("=" * 50)
-    print("🎉 All tests passed!")
+def run_all_tests():
+    """Запуск всех тестов (для запуска без вызова pytest из командной строки)"""
+    # Тесты используют фикстуры pytest, поэтому запускаем их через pytest
+    return pytest.main([__file__, "-q"])
 
 
 if __name__ == "__main__":
-    try:
-        run_all_tests()
-    except AssertionError as e:
-        print(f"❌ Test failed: {e}")
-        exit(1)
-    except Exception as e:
-        print(f"💥 Unexpected error: {e}")
-        exit(1)
+    exit(run_all_tests())